@@ -1,6 +1,18 @@
+import os
+from collections import namedtuple
+
+import numpy as np
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
+
+import convert_to_parquet
+
+# orjson writes NumPy arrays straight to JSON without per-element Python
+# conversion; request it explicitly instead of relying on "auto" detection.
+pio.json.config.default_engine = "orjson"
 
 # ==========================
 # PAGE CONFIG
@@ -18,15 +30,167 @@ st.set_page_config(
 def load_data():
     """
     Load and prepare dataset.
-    - Rename columns for clarity
+    - Convert the CSV to Parquet on first run, then load the Parquet file
+      (columnar binary, categorical dtypes already applied)
     - Calculate BMI
+    - Precompute the medal-row bitmap used by the medal panels
+    - Precompute the sidebar option lists (years, sports, countries)
     """
-    df = pd.read_csv("athlete_events.csv")
-    df.rename(columns={'NOC': 'Country', 'Team': 'Team Name'}, inplace=True)
-    df['BMI'] = df['Weight'] / ((df['Height'] / 100) ** 2)
-    return df
+    if not os.path.exists(convert_to_parquet.PARQUET_PATH):
+        convert_to_parquet.convert()
+    df = pd.read_parquet(convert_to_parquet.PARQUET_PATH)
+    # The Parquet file is already written sorted by Year; the stable
+    # re-sort is a cheap safety net that guarantees the searchsorted range
+    # slicing in get_filtered stays valid. int16 comfortably holds years
+    # and quarters the memory scanned by the filter.
+    df = df.sort_values('Year', kind='stable', ignore_index=True)
+    df['Year'] = df['Year'].astype('int16')
+    # In-place NumPy ops reuse one float32 buffer instead of allocating a
+    # float64 temporary per step; float32 also halves downstream memory.
+    bmi = df['Height'].to_numpy(dtype='float32')
+    np.multiply(bmi, 0.01, out=bmi)
+    np.square(bmi, out=bmi)
+    np.divide(df['Weight'].to_numpy(dtype='float32'), bmi, out=bmi)
+    df['BMI'] = bmi
+    df['HasMedal'] = df['Medal'].notna()
+    years = sorted(df['Year'].unique().tolist())
+    # Categorical columns keep their categories sorted and NA-free, so the
+    # option lists come straight from the dtype.
+    sports = df['Sport'].cat.categories.tolist()
+    countries = df['Country'].cat.categories.tolist()
+    return df, years, sports, countries
+
+df, year_list, sport_list, country_list = load_data()
+
+# ==========================
+# CACHED FILTERING & AGGREGATIONS
+# ==========================
+# Tiny immutable key for the sidebar selections. Cached functions take this
+# instead of the DataFrame, so Streamlit hashes a 4-tuple in O(1) rather
+# than walking a ~270k-row frame.
+FilterKey = namedtuple('FilterKey', ['year_lo', 'year_hi', 'sport', 'countries'])
+
+@st.cache_data
+def get_filtered(key):
+    """
+    Return the slice of the dataset matching the sidebar selections.
+
+    Cached on the (year range, sport, countries) selections, so toggling
+    a widget back to a previous value reuses the already computed slice.
+    """
+    df = load_data()[0]
+    # The frame is sorted by Year, so the range filter is a binary search
+    # plus a zero-copy slice instead of a full boolean scan.
+    lo, hi = np.searchsorted(df['Year'].to_numpy(), [key.year_lo, key.year_hi + 1])
+    sliced = df.iloc[lo:hi]
+    # Sport/country conditions combine into one boolean mask over the
+    # (usually much smaller) year slice, indexed once.
+    mask = None
+    if key.sport != "All":
+        mask = (sliced['Sport'] == key.sport).to_numpy()
+    if key.countries:
+        # Boolean lookup table over the category codes: one vectorized
+        # gather over int codes instead of hashing a string per row. The
+        # extra trailing slot keeps missing values (code -1) unselected.
+        cat = sliced['Country'].cat
+        lut = np.zeros(len(cat.categories) + 1, dtype=bool)
+        lut[cat.categories.get_indexer(key.countries)] = True
+        country_mask = lut[cat.codes.to_numpy()]
+        mask = country_mask if mask is None else mask & country_mask
+    return sliced if mask is None else sliced.loc[mask]
+
+@st.cache_data
+def get_metrics(key):
+    """Header metric scalars for the given filter selections."""
+    filtered = get_filtered(key)
+    uniques = filtered[['ID', 'Event', 'Country']].nunique()
+    return {
+        'athletes': uniques['ID'],
+        'events': uniques['Event'],
+        'countries': uniques['Country'],
+        'medals': int(filtered['HasMedal'].sum()),
+    }
+
+@st.cache_data
+def get_histogram_by_gender(key, column, bins=40):
+    """Pre-binned histogram counts of ``column`` per gender, shared edges."""
+    data = get_filtered(key)[['Sex', column]].dropna()
+    _, edges = np.histogram(data[column], bins=bins)
+    counts = {
+        sex: np.histogram(data.loc[data['Sex'] == sex, column], bins=edges)[0]
+        for sex in data['Sex'].cat.categories
+    }
+    return edges, counts
+
+@st.cache_data
+def get_gender_counts(key):
+    """Athlete counts per gender for the given filter selections."""
+    filtered = get_filtered(key)
+    sex = filtered['Sex']
+    # np.bincount over the int8 category codes is a single C pass, cheaper
+    # than a hash-based value_counts on this two-category column.
+    codes = sex.cat.codes.to_numpy()
+    counts = np.bincount(codes[codes >= 0], minlength=len(sex.cat.categories))
+    return pd.Series(counts, index=sex.cat.categories)
+
+@st.cache_data
+def get_medal_counts_by_sport(key):
+    """Top 10 sports by medal count for the given filter selections."""
+    filtered = get_filtered(key)
+    return (
+        filtered.loc[filtered['HasMedal'], ['Sport']]
+        .groupby('Sport', observed=True, sort=False)
+        .size()
+        .nlargest(10)
+    )
+
+@st.cache_data
+def get_top_athletes(key):
+    """Top 10 athletes by medal count for the given filter selections."""
+    filtered = get_filtered(key)
+    return (
+        filtered.loc[filtered['HasMedal'], ['Name']]
+        .groupby('Name', sort=False)
+        .size()
+        .nlargest(10)
+    )
+
+@st.cache_data
+def get_medal_year_type(key):
+    """
+    Medal counts per (Year, Medal type) for the given filter selections.
+
+    Returns (years, counts, medal_types) with counts a dense
+    len(years) x len(medal_types) matrix, built by scattering directly on
+    the integer year/medal indices — no hash table, no unstack pivot.
+    """
+    filtered = get_filtered(key)
+    medal_rows = filtered['HasMedal'].to_numpy()
+    years, year_idx = np.unique(
+        filtered['Year'].to_numpy()[medal_rows], return_inverse=True
+    )
+    medal_types = filtered['Medal'].cat.categories.tolist()
+    medal_idx = filtered['Medal'].cat.codes.to_numpy()[medal_rows]
+    counts = np.zeros((len(years), len(medal_types)), dtype=np.int32)
+    np.add.at(counts, (year_idx, medal_idx), 1)
+    return years, counts, medal_types
+
+@st.cache_data
+def get_country_medals_over_years(key):
+    """Medal counts per (Year, Country) for the given filter selections."""
+    filtered = get_filtered(key)
+    return (
+        filtered.loc[filtered['HasMedal'], ['Year', 'Country']]
+        .groupby(['Year', 'Country'], observed=True)
+        .size()
+        .reset_index(name='Medal')
+    )
 
-df = load_data()
+@st.cache_data
+def get_athlete_counts_overall(key):
+    """Unique athlete count per year for the given filter selections."""
+    filtered = get_filtered(key)
+    return filtered.groupby('Year')['ID'].nunique()
 
 # ==========================
 # SIDEBAR FILTERS
@@ -34,8 +198,7 @@ df = load_data()
 st.sidebar.header("Filters (ตัวกรอง)")
 
 # Year range slider
-year_list = sorted(df['Year'].unique())
-min_year, max_year = min(year_list), max(year_list)
+min_year, max_year = year_list[0], year_list[-1]
 selected_year_range = st.sidebar.slider(
     "Select Year Range (เลือกช่วงปี)",
     min_value=min_year,
@@ -45,26 +208,22 @@ selected_year_range = st.sidebar.slider(
 )
 
 # Sport filter
-sport_list = sorted(df['Sport'].dropna().unique())
 selected_sport = st.sidebar.selectbox("Select Sport (เลือกประเภทกีฬา)", ["All"] + sport_list)
 
 # Country multiselect
-country_list = sorted(df['Country'].dropna().unique())
 selected_countries = st.sidebar.multiselect(
     "Select Country (เลือกประเทศ)",
     country_list
 )
 
 # Apply filters
-filtered_df = df.copy()
-filtered_df = filtered_df[
-    (filtered_df['Year'] >= selected_year_range[0]) &
-    (filtered_df['Year'] <= selected_year_range[1])
-]
-if selected_sport != "All":
-    filtered_df = filtered_df[filtered_df['Sport'] == selected_sport]
-if selected_countries:
-    filtered_df = filtered_df[filtered_df['Country'].isin(selected_countries)]
+filter_key = FilterKey(
+    year_lo=selected_year_range[0],
+    year_hi=selected_year_range[1],
+    sport=selected_sport,
+    countries=tuple(sorted(selected_countries)),
+)
+filtered_df = get_filtered(filter_key)
 
 # ==========================
 # MAIN TITLE & METRICS
@@ -72,156 +231,207 @@ if selected_countries:
 st.title("🏅 Olympic Athlete Data Analysis Dashboard")
 st.markdown("### Dashboard Overview")
 
+metrics = get_metrics(filter_key)
 col1, col2, col3, col4 = st.columns(4)
-col1.metric("Total Athletes", f"{filtered_df['ID'].nunique():,}")
-col2.metric("Total Events", f"{filtered_df['Event'].nunique():,}")
-col3.metric("Total Countries", f"{filtered_df['Country'].nunique():,}")
-col4.metric("Total Medals", f"{len(filtered_df.dropna(subset=['Medal'])):,}")
+col1.metric("Total Athletes", f"{metrics['athletes']:,}")
+col2.metric("Total Events", f"{metrics['events']:,}")
+col3.metric("Total Countries", f"{metrics['countries']:,}")
+col4.metric("Total Medals", f"{metrics['medals']:,}")
 
 st.markdown("---")
 st.markdown("### Dataset Overview")
 st.dataframe(filtered_df.head())
 
 # ==========================
-# AGE & GENDER DISTRIBUTIONS
+# CHART PANELS
 # ==========================
-st.markdown("---")
-st.header("Key Distributions")
-
-col1, col2 = st.columns(2)
+# Each panel is a fragment: interactions scoped to one panel rerun only
+# that panel instead of rebuilding all nine figures. Figures are built
+# with graph_objects traces over the cached aggregates, skipping Plotly
+# Express's per-rerun DataFrame copies and column inference.
+def histogram_figure(edges, counts, title, xaxis_title):
+    """Stacked per-gender bar figure from pre-binned histogram counts."""
+    centers = (edges[:-1] + edges[1:]) / 2
+    fig = go.Figure()
+    for sex, count in counts.items():
+        fig.add_bar(x=centers, y=count, width=np.diff(edges), name=str(sex))
+    fig.update_layout(
+        barmode='stack',
+        title=title,
+        xaxis_title=xaxis_title,
+        yaxis_title='count',
+        legend_title_text='Sex'
+    )
+    return fig
 
-with col1:
+@st.fragment
+def panel_age_distribution(filter_key):
     st.subheader("1. Age Distribution by Gender")
-    fig_age = px.histogram(
-        filtered_df.dropna(subset=['Age']),
-        x='Age',
-        color='Sex',
-        marginal="box",
-        hover_data=filtered_df.columns,
-        title='Age Distribution by Gender'
-    )
+    edges, counts = get_histogram_by_gender(filter_key, 'Age')
+    fig_age = histogram_figure(edges, counts, 'Age Distribution by Gender', 'Age')
     st.plotly_chart(fig_age, use_container_width=True)
 
-with col2:
+@st.fragment
+def panel_gender_proportion(filter_key):
     st.subheader("2. Gender Proportion")
-    gender_counts = filtered_df['Sex'].value_counts()
-    fig_gender = px.pie(
-        values=gender_counts.values,
-        names=gender_counts.index,
-        title='Gender Distribution'
-    )
+    gender_counts = get_gender_counts(filter_key)
+    fig_gender = go.Figure(go.Pie(
+        labels=gender_counts.index.tolist(),
+        values=gender_counts.to_numpy()
+    ))
+    fig_gender.update_layout(title='Gender Distribution')
     st.plotly_chart(fig_gender, use_container_width=True)
 
-# ==========================
-# PHYSICAL ATTRIBUTES
-# ==========================
-st.markdown("---")
-st.header("Physical Attributes")
-
-col3, col4 = st.columns(2)
-
-with col3:
+@st.fragment
+def panel_height_weight(filter_key):
     st.subheader("3. Height vs Weight")
+    df_hw = get_filtered(filter_key).dropna(subset=['Height', 'Weight', 'Sex'])
+    # Beyond ~10k points the extra markers are pure overdraw, so ship a
+    # deterministic sample to the browser instead of every row.
+    if len(df_hw) > 10_000:
+        df_hw = df_hw.sample(n=10_000, random_state=0)
     fig_hw = px.scatter(
-        filtered_df.dropna(subset=['Height', 'Weight', 'Sex']),
+        df_hw,
         x='Height',
         y='Weight',
         color='Sex',
         hover_data=['Name', 'Sport', 'Country'],
+        render_mode="webgl",
         title='Height vs Weight of Athletes'
     )
     st.plotly_chart(fig_hw, use_container_width=True)
 
-with col4:
+@st.fragment
+def panel_bmi_distribution(filter_key):
     st.subheader("4. BMI Distribution")
-    fig_bmi = px.histogram(
-        filtered_df.dropna(subset=['BMI']),
-        x='BMI',
-        color='Sex',
-        marginal="box",
-        hover_data=filtered_df.columns,
-        title='BMI Distribution by Gender'
-    )
+    edges, counts = get_histogram_by_gender(filter_key, 'BMI')
+    fig_bmi = histogram_figure(edges, counts, 'BMI Distribution by Gender', 'BMI')
     st.plotly_chart(fig_bmi, use_container_width=True)
 
-# ==========================
-# EVENT & MEDAL ANALYSIS
-# ==========================
-st.markdown("---")
-st.header("Event and Medal Analysis")
-
-col5, col6 = st.columns(2)
-
-with col5:
+@st.fragment
+def panel_top_sports(filter_key):
     st.subheader("5. Top 10 Sports by Medals")
-    medal_counts = filtered_df.dropna(subset=['Medal'])['Sport'].value_counts().head(10)
-    fig_top_sport_medals = px.bar(
-        medal_counts,
-        x=medal_counts.index,
-        y=medal_counts.values,
+    medal_counts = get_medal_counts_by_sport(filter_key)
+    fig_top_sport_medals = go.Figure(go.Bar(
+        x=medal_counts.index.tolist(),
+        y=medal_counts.to_numpy()
+    ))
+    fig_top_sport_medals.update_layout(
         title='Top 10 Sports by Number of Medals',
-        labels={'x': 'Sport', 'y': 'Number of Medals'}
+        xaxis_title='Sport',
+        yaxis_title='Number of Medals'
     )
     st.plotly_chart(fig_top_sport_medals, use_container_width=True)
 
-with col6:
+@st.fragment
+def panel_medals_over_years(filter_key):
     st.subheader("6. Medals Over the Years by Type")
-    medal_year_type = filtered_df.dropna(subset=['Medal']).groupby(['Year', 'Medal'])['ID'].count().unstack(fill_value=0)
-    fig_medals_over_years = px.line(
-        medal_year_type,
-        x=medal_year_type.index,
-        y=medal_year_type.columns,
+    years, counts, medal_types = get_medal_year_type(filter_key)
+    fig_medals_over_years = go.Figure()
+    for i, medal in enumerate(medal_types):
+        fig_medals_over_years.add_scatter(
+            x=years,
+            y=counts[:, i],
+            mode='lines+markers',
+            name=str(medal)
+        )
+    fig_medals_over_years.update_layout(
         title='Number of Medals Over the Years by Type',
-        markers=True
+        xaxis_title='Year',
+        yaxis_title='count',
+        legend_title_text='Medal'
     )
     st.plotly_chart(fig_medals_over_years, use_container_width=True)
 
+@st.fragment
+def panel_top_athletes(filter_key):
+    st.subheader("7. Top 10 Athletes with Most Medals")
+    top_athletes = get_top_athletes(filter_key)
+    fig_top_athletes = go.Figure(go.Bar(
+        x=top_athletes.index.tolist(),
+        y=top_athletes.to_numpy()
+    ))
+    fig_top_athletes.update_layout(
+        title='Top 10 Athletes with Most Medals',
+        xaxis_title='Athlete Name',
+        yaxis_title='Number of Medals'
+    )
+    st.plotly_chart(fig_top_athletes, use_container_width=True)
+
+@st.fragment
+def panel_country_medals(filter_key):
+    st.subheader("8. Medal Count for Selected Countries")
+    if filter_key.countries:
+        country_medals_over_years = get_country_medals_over_years(filter_key)
+        fig_country_medals = go.Figure()
+        for country, group in country_medals_over_years.groupby('Country', observed=True):
+            fig_country_medals.add_scatter(
+                x=group['Year'].to_numpy(),
+                y=group['Medal'].to_numpy(),
+                mode='lines+markers',
+                name=str(country)
+            )
+        fig_country_medals.update_layout(
+            title="Medal Count Over the Years (Selected Countries)",
+            xaxis_title='Year',
+            yaxis_title='Medal',
+            legend_title_text='Country'
+        )
+        st.plotly_chart(fig_country_medals, use_container_width=True)
+    else:
+        st.info("Please select one or more countries from the sidebar to see their medal counts.")
+
+@st.fragment
+def panel_athletes_over_years(filter_key):
+    st.subheader("9. Athletes Over the Years")
+    athlete_counts_overall = get_athlete_counts_overall(filter_key)
+    fig_athletes_overall = go.Figure(go.Scatter(
+        x=athlete_counts_overall.index.to_numpy(),
+        y=athlete_counts_overall.to_numpy(),
+        mode='lines+markers'
+    ))
+    fig_athletes_overall.update_layout(
+        title='Number of Unique Athletes Over the Years',
+        xaxis_title='Year',
+        yaxis_title='Number of Athletes'
+    )
+    st.plotly_chart(fig_athletes_overall, use_container_width=True)
+
 # ==========================
-# COUNTRY & ATHLETE PERFORMANCE
+# CHART SECTIONS
 # ==========================
+# Tabs defer rendering: the browser only draws the charts of the active
+# tab instead of all nine figures above and below the fold.
 st.markdown("---")
-st.header("Country and Athlete Performance")
-
-st.subheader("7. Top 10 Athletes with Most Medals")
-top_athletes = filtered_df.dropna(subset=['Medal']).groupby('Name')['Medal'].count().sort_values(ascending=False).head(10)
-fig_top_athletes = px.bar(
-    top_athletes,
-    x=top_athletes.index,
-    y=top_athletes.values,
-    title='Top 10 Athletes with Most Medals',
-    labels={'x': 'Athlete Name', 'y': 'Number of Medals'}
-)
-st.plotly_chart(fig_top_athletes, use_container_width=True)
-
-st.subheader("8. Medal Count for Selected Countries")
-if selected_countries:
-    country_medals_over_years = (
-        filtered_df[filtered_df['Country'].isin(selected_countries)]
-        .dropna(subset=['Medal'])
-        .groupby(['Year', 'Country'])['Medal']
-        .count()
-        .reset_index()
-    )
-    fig_country_medals = px.line(
-        country_medals_over_years,
-        x='Year',
-        y='Medal',
-        color='Country',
-        title="Medal Count Over the Years (Selected Countries)",
-        markers=True
-    )
-    st.plotly_chart(fig_country_medals, use_container_width=True)
-else:
-    st.info("Please select one or more countries from the sidebar to see their medal counts.")
-
-st.subheader("9. Athletes Over the Years")
-athlete_counts_overall = filtered_df.groupby('Year')['ID'].nunique()
-fig_athletes_overall = px.line(
-    athlete_counts_overall,
-    x=athlete_counts_overall.index,
-    y=athlete_counts_overall.values,
-    title='Number of Unique Athletes Over the Years',
-    labels={'x': 'Year', 'y': 'Number of Athletes'},
-    markers=True
-)
-st.plotly_chart(fig_athletes_overall, use_container_width=True)
\ No newline at end of file
+tab_distributions, tab_physical, tab_events, tab_countries = st.tabs([
+    "Key Distributions",
+    "Physical Attributes",
+    "Event and Medal Analysis",
+    "Country and Athlete Performance",
+])
+
+with tab_distributions:
+    col1, col2 = st.columns(2)
+    with col1:
+        panel_age_distribution(filter_key)
+    with col2:
+        panel_gender_proportion(filter_key)
+
+with tab_physical:
+    col3, col4 = st.columns(2)
+    with col3:
+        panel_height_weight(filter_key)
+    with col4:
+        panel_bmi_distribution(filter_key)
+
+with tab_events:
+    col5, col6 = st.columns(2)
+    with col5:
+        panel_top_sports(filter_key)
+    with col6:
+        panel_medals_over_years(filter_key)
+
+with tab_countries:
+    panel_top_athletes(filter_key)
+    panel_country_medals(filter_key)
+    panel_athletes_over_years(filter_key)
\ No newline at end of file